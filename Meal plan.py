@@ -1,110 +1,512 @@
-import random
+import numpy as np
 import tkinter as tk
 from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
+import queue
+import os
+import gc
+from contextlib import contextmanager, nullcontext
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from numba import config as numba_config, njit, prange, get_num_threads, set_num_threads
+    NUMBA_AVAILABLE = True
+    # TBB, Numba's first choice, hangs interpreter exit once a kernel has run off the main thread (the GUI's worker)
+    numba_config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+except ImportError:  # numba is optional, breeding then falls back to whole-population NumPy operators
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # optional, only used to cap NumPy's BLAS/OpenMP thread pools
+    threadpool_limits = None
+
+CATEGORIES = ['staple', 'side', 'vegetable', 'fruit', 'complement']
+NUTRIENTS = ['calories', 'protein', 'fat', 'sodium']
+ALLERGENS = ['nuts', 'gluten', 'soy', 'dairy']  # bit i of an allergen mask is ALLERGENS[i]
+MEALS = 21
+
+rng = np.random.default_rng()  # shared generator for all host-side sampling
 
 # ---------------------- Food Database ---------------------- #
+def allergen_bits(allergens):
+    """Bitmask of the known allergens in the given collection; unknown names are ignored."""
+    bits = 0
+    for a in allergens:
+        if a in ALLERGENS:
+            bits |= 1 << ALLERGENS.index(a)
+    return bits
+
 class FoodDatabase:
     def __init__(self, size=100):
-        categories = ['staple', 'side', 'vegetable', 'fruit', 'complement']
-        allergens = ['nuts', 'gluten', 'soy', 'dairy']
-        self.foods = {cat: [
-            {
-                'name': f"{cat}_{i}",
-                'nutrition': {
-                    'calories': random.randint(50, 300),
-                    'protein': random.uniform(2, 20),
-                    'fat': random.uniform(1, 15),
-                    'sodium': random.randint(10, 400)
-                },
-                'allergens': set(random.choices(allergens, k=random.randint(0, 2)))
-            } for i in range(size // 5)] for cat in categories
-        }
-
-    def get_random_meal(self, allowed_allergens):
-        meal = {}
-        for cat, items in self.foods.items():
-            valid_items = [f for f in items if not (f['allergens'] - allowed_allergens)]
-            if not valid_items:
-                valid_items = items  # fallback
-            food = random.choice(valid_items)
-            portion = random.uniform(0.5, 2.0)
-            meal[cat] = food
-            meal[f'portion_{cat}'] = portion
-        return meal
-
-# ---------------------- Individual Representation ---------------------- #
-class Individual:
-    def __init__(self, db, allowed_allergens):
-        self.genes = [db.get_random_meal(allowed_allergens) for _ in range(21)]
-        self.fitness = 0
-
-    def evaluate(self, goals):
-        nutrients = {'calories': 0, 'protein': 0, 'fat': 0, 'sodium': 0}
-        for meal in self.genes:
-            for cat in ['staple', 'side', 'vegetable', 'fruit', 'complement']:
-                food = meal[cat]
-                portion = meal[f'portion_{cat}']
-                for k in nutrients:
-                    nutrients[k] += food['nutrition'][k] * portion
-
-        score = 0
-        for k in nutrients:
-            diff = abs(goals[k] - nutrients[k])
-            score -= diff / goals[k]  # normalized difference
-
-        diversity_score = len(set(f['name'] for m in self.genes for f in m.values() if isinstance(f, dict)))
-        score += diversity_score * 0.01
-
-        self.fitness = score
-        return score
-
-    def mutate(self, db, allowed_allergens, rate=0.05):
-        for i in range(len(self.genes)):
-            if random.random() < rate:
-                self.genes[i] = db.get_random_meal(allowed_allergens)
-
-    def crossover(self, other):
-        child = Individual.__new__(Individual)
-        child.genes = [random.choice([m1, m2]) for m1, m2 in zip(self.genes, other.genes)]
-        return child
+        n = size // 5
+        # Structure-of-arrays: plain arrays addressed by category and item, names kept for display only
+        self.names = [[f"{cat}_{i}" for i in range(n)] for cat in CATEGORIES]
+        shape = (len(CATEGORIES), n)
+        calories = rng.integers(50, 300, size=shape, endpoint=True)
+        protein = rng.uniform(2, 20, size=shape)
+        fat = rng.uniform(1, 15, size=shape)
+        sodium = rng.integers(10, 400, size=shape, endpoint=True)
+        # one (num_cats * n, 4) table for all categories; food k*n + i is item i of category k
+        self.all_nutrition = np.stack([calories, protein, fat, sodium], axis=-1).astype(np.float32).reshape(-1, 4)
+        self.cat_offsets = (np.arange(len(CATEGORIES)) * n).astype(np.int32)
+
+        # each food draws 0-2 allergens with replacement: OR together the bits of its first `count` picks
+        picks = rng.integers(0, len(ALLERGENS), size=shape + (2,))
+        count = rng.integers(0, 2, size=shape, endpoint=True)
+        bits = np.where(np.arange(2) < count[..., None], 1 << picks, 0)
+        self.allergen_mask = (bits[..., 0] | bits[..., 1]).astype(np.int8)  # (num_cats, n)
+        self._allowed_cache = {}  # frozenset of allowed allergens -> allowed_indices result
+
+    def allowed_indices(self, frozen_allergens):
+        """Global ids of foods free of disallowed allergens, as one read-only array per category.
+
+        Takes a frozenset, the key of the per-instance cache; every caller shares the cached arrays.
+        """
+        allowed = self._allowed_cache.get(frozen_allergens)
+        if allowed is None:
+            allowed_bits = allergen_bits(frozen_allergens)
+            allowed = []
+            for k, mask in enumerate(self.allergen_mask):
+                valid_items = np.flatnonzero((mask & ~allowed_bits) == 0)
+                if not valid_items.size:
+                    valid_items = np.arange(len(mask))  # fallback
+                ids = (self.cat_offsets[k] + valid_items).astype(np.int32)
+                ids.flags.writeable = False
+                allowed.append(ids)
+            allowed = self._allowed_cache[frozen_allergens] = tuple(allowed)
+        return allowed
+
+    def allowed_table(self, allowed_allergens):
+        """Allowed global ids padded into a (num_cats, n) table plus per-category counts, for the breed kernel."""
+        allowed = self.allowed_indices(frozenset(allowed_allergens))
+        table = np.zeros(self.allergen_mask.shape, dtype=np.int32)
+        counts = np.empty(len(CATEGORIES), dtype=np.int32)
+        for k, ids in enumerate(allowed):
+            counts[k] = len(ids)
+            table[k, :counts[k]] = ids
+        return table, counts
+
+# ---------------------- Population Representation ---------------------- #
+# A population is a pair of (P, 21, 5) arrays, global food ids (int32) and portions (float32),
+# plus a (P,) float32 fitness array; row p is one weekly plan.
+def random_meals(allowed, allowed_counts, shape):
+    """Allergen-safe meals of the given leading shape, as (*shape, 5) global food ids and portions."""
+    picks = rng.integers(0, allowed_counts, size=tuple(shape) + (len(CATEGORIES),))
+    idx = allowed[np.arange(len(CATEGORIES)), picks]
+    portions = rng.uniform(0.5, 2.0, size=idx.shape).astype(np.float32)
+    return idx, portions
+
+def random_population(allowed, allowed_counts, size):
+    return random_meals(allowed, allowed_counts, (size, MEALS))
+
+def crossover_population(parent_idx, parent_port, parent_pairs):
+    """Children that take each meal from one of their two parents at random."""
+    take_first = rng.random((len(parent_pairs), MEALS)) < 0.5
+    src = np.where(take_first, parent_pairs[:, :1], parent_pairs[:, 1:])  # (n_children, 21)
+    return parent_idx[src, np.arange(MEALS)], parent_port[src, np.arange(MEALS)]
+
+def mutate_population(pop_idx, pop_port, allowed, allowed_counts, rate=0.05):
+    """Replace each meal, with probability rate, by a fresh allergen-safe meal; modifies the arrays in place."""
+    mutated = rng.random(pop_idx.shape[:2]) < rate
+    pop_idx[mutated], pop_port[mutated] = random_meals(allowed, allowed_counts, (np.count_nonzero(mutated),))
+
+def nutrient_score(pop_idx, pop_portions, db_nut, inv_goals):
+    """Normalized distance from the goals for a whole (P, 21, 5) population in one gather + einsum.
+
+    Goals arrive as their reciprocals, so |goal - total| / goal is computed as |1 - total * inv_goal|.
+    All inputs are float32 (portions, nutrition and inv_goals), which halves the bandwidth of the gather.
+    """
+    nut = db_nut[pop_idx]  # (P, 21, 5, 4)
+    # nutrient totals stay far below float32's exact-integer range, so float32 accumulation is safe
+    totals = np.einsum('pmck,pmc->pk', nut, pop_portions, dtype=np.float32)
+    return -np.abs(1 - totals * inv_goals).sum(axis=1)
+
+def evaluate_population(pop_idx, pop_portions, db_nut, inv_goals):
+    """Nutrient score plus diversity bonus for every plan in the population."""
+    fitness = nutrient_score(pop_idx, pop_portions, db_nut, inv_goals)
+
+    # distinct foods per plan, marked in a (P, num_foods) presence table
+    seen = np.zeros((len(pop_idx), len(db_nut)), dtype=bool)
+    seen[np.arange(len(pop_idx))[:, None], pop_idx.reshape(len(pop_idx), -1)] = True
+    return fitness + np.count_nonzero(seen, axis=1).astype(np.float32) * np.float32(0.01)
+
+@njit(parallel=True, cache=True)
+def breed_and_eval(parent_idx, parent_port, parent_pairs, db_nut, allowed, allowed_counts, inv_goals, rate,
+                   out_idx, out_port, out_fit):
+    """Fill out_* with crossed-over, mutated and evaluated children of the given parent pairs."""
+    n_meals, num_cats = parent_idx.shape[1:]
+    for i in prange(out_idx.shape[0]):
+        a, b = parent_pairs[i, 0], parent_pairs[i, 1]
+        for m in range(n_meals):
+            if np.random.random() < rate:
+                for k in range(num_cats):
+                    out_idx[i, m, k] = allowed[k, np.random.randint(0, allowed_counts[k])]
+                    out_port[i, m, k] = np.random.uniform(0.5, 2.0)
+            else:
+                src = a if np.random.random() < 0.5 else b
+                for k in range(num_cats):
+                    out_idx[i, m, k] = parent_idx[src, m, k]
+                    out_port[i, m, k] = parent_port[src, m, k]
+
+        totals = np.zeros(db_nut.shape[1], dtype=np.float32)
+        seen = np.zeros(db_nut.shape[0], dtype=np.bool_)
+        diversity = 0
+        for m in range(n_meals):
+            for k in range(num_cats):
+                food = out_idx[i, m, k]
+                for j in range(db_nut.shape[1]):
+                    totals[j] += db_nut[food, j] * out_port[i, m, k]
+                if not seen[food]:
+                    seen[food] = True
+                    diversity += 1
+
+        score = np.float32(0.0)
+        for j in range(db_nut.shape[1]):
+            score -= abs(1 - totals[j] * inv_goals[j])  # normalized difference
+        out_fit[i] = score + np.float32(diversity) * np.float32(0.01)
+
+def select_parents(n_children, pool_size):
+    """(n_children, 2) distinct parent indices into the top pool_size individuals."""
+    if pool_size < 2:
+        raise ValueError(f"need at least 2 individuals to pick distinct parents, got {pool_size}")
+    pairs = rng.integers(0, pool_size, size=(n_children, 2), dtype=np.int32)
+    same = pairs[:, 0] == pairs[:, 1]
+    while same.any():
+        pairs[same, 1] = rng.integers(0, pool_size, size=same.sum(), dtype=np.int32)
+        same = pairs[:, 0] == pairs[:, 1]
+    return pairs
+
+def top_k(fit, k):
+    """Indices of the k fittest individuals, best first, without sorting the rest."""
+    top = np.argpartition(fit, -k)[-k:]
+    return top[np.argsort(-fit[top], kind='stable')]
+
+def converged(best_history, fit_std, stagnation, early_stop):
+    """Early-stop test on the best-fitness history and the spread of the latest generation.
+
+    Only a flat generation (stagnation > 0) can stop the run. It stops after early_stop flat
+    generations, or after half as many once the population has collapsed (tiny fitness spread)
+    or the best fitness shows no upward trend over the last early_stop generations.
+    """
+    if stagnation == 0:
+        return False
+    if stagnation >= early_stop:
+        return True
+    if stagnation < max(1, early_stop // 2):
+        return False
+    if fit_std < 1e-4:
+        return True
+    window = early_stop
+    if window < 2 or len(best_history) < window:
+        return False  # a trend needs at least two points
+    return np.polyfit(np.arange(window), best_history[-window:], 1)[0] < 1e-4
+
+def breed_children(parent_idx, parent_port, parent_pairs, db_nut, allowed, allowed_counts, inv_goals, rate):
+    if not NUMBA_AVAILABLE:
+        child_idx, child_port = crossover_population(parent_idx, parent_port, parent_pairs)
+        mutate_population(child_idx, child_port, allowed, allowed_counts, rate)
+        return child_idx, child_port, evaluate_population(child_idx, child_port, db_nut, inv_goals)
+
+    n_children = len(parent_pairs)
+    child_idx = np.empty((n_children,) + parent_idx.shape[1:], dtype=np.int32)
+    child_port = np.empty((n_children,) + parent_port.shape[1:], dtype=np.float32)
+    child_fit = np.empty(n_children, dtype=np.float32)
+    breed_and_eval(parent_idx, parent_port, parent_pairs, db_nut, allowed, allowed_counts,
+                   inv_goals, rate, child_idx, child_port, child_fit)
+    return child_idx, child_port, child_fit
+
+def next_generation(pop_idx, pop_port, pop_fit, n_elite, n_children, breed):
+    """Elites of the ranked mating pool followed by freshly bred children, unranked."""
+    parent_pairs = select_parents(n_children, len(pop_idx))
+    child_idx, child_port, child_fit = breed(pop_idx, pop_port, parent_pairs)
+    return (np.concatenate([pop_idx[:n_elite], child_idx]),
+            np.concatenate([pop_port[:n_elite], child_port]),
+            np.concatenate([pop_fit[:n_elite], child_fit]))
+
+# ---------------------- Worker Processes ---------------------- #
+# forking would copy the GUI and Numba thread pools into children, which is unsafe; start fresh interpreters
+_mp_context = mp.get_context('spawn')
+_worker_state = {}
+
+def _share_array(arr):
+    """Copy arr into a new shared-memory segment; the caller closes and unlinks it."""
+    shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    return shm
+
+@contextmanager
+def single_threaded():
+    """Cap NumPy's BLAS/OpenMP pools and Numba's prange at one thread inside the block."""
+    limits = threadpool_limits(1) if threadpool_limits is not None else nullcontext()
+    previous = get_num_threads() if NUMBA_AVAILABLE else None
+    with limits:
+        if NUMBA_AVAILABLE:
+            set_num_threads(1)
+        try:
+            yield
+        finally:
+            if NUMBA_AVAILABLE:
+                set_num_threads(previous)
+
+def _pin_worker_threads():
+    # the worker processes already split the cores; nested BLAS/OpenMP/Numba pools would oversubscribe them
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = '1'  # for runtimes that initialize lazily, after this point
+    if threadpool_limits is not None:
+        threadpool_limits(1)  # for the ones NumPy already loaded
+    if NUMBA_AVAILABLE:
+        set_num_threads(1)
+
+def _init_worker(shm_name, nut_shape, nut_dtype, inv_goals, allowed, allowed_counts, rate):
+    _pin_worker_threads()
+    # attach to the shared nutrition table once per process; the segment must outlive the view
+    shm = shared_memory.SharedMemory(name=shm_name)
+    db_nut = np.ndarray(nut_shape, dtype=nut_dtype, buffer=shm.buf)
+    _worker_state.update(shm=shm, db_nut=db_nut, inv_goals=inv_goals, allowed=allowed, allowed_counts=allowed_counts,
+                         rate=rate)
+
+def _breed_worker(args):
+    parent_idx, parent_port, parent_pairs = args
+    st = _worker_state
+    return breed_children(parent_idx, parent_port, parent_pairs, st['db_nut'], st['allowed'], st['allowed_counts'],
+                          st['inv_goals'], st['rate'])
+
+def _island_worker(seed, shm_name, nut_shape, allowed, allowed_counts, inv_goals, size, elitism, rate, generations,
+                   migration_interval, n_migrants, conn):
+    global rng
+    _pin_worker_threads()
+    rng = np.random.default_rng(seed)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        db_nut = np.ndarray(nut_shape, dtype=np.float32, buffer=shm.buf)
+        _run_island(db_nut, allowed, allowed_counts, inv_goals, size, elitism, rate, generations,
+                    migration_interval, n_migrants, conn)
+        del db_nut  # the view must be released before the segment can be closed
+    finally:
+        shm.close()
+        conn.close()
+
+def _run_island(db_nut, allowed, allowed_counts, inv_goals, size, elitism, rate, generations,
+                migration_interval, n_migrants, conn):
+    """Evolve one deme, exchanging its top n_migrants with the master every migration_interval generations."""
+    def breed(parent_idx, parent_port, parent_pairs):
+        return breed_children(parent_idx, parent_port, parent_pairs, db_nut, allowed, allowed_counts, inv_goals, rate)
+
+    n_elite = int(elitism * size)
+    n_children = size - n_elite
+    pool_size = max(2, size // 2)  # top half, as 50 of 100 for a single population; small demes need it to select
+
+    pop_idx, pop_port = random_population(allowed, allowed_counts, size)
+    pop_fit = evaluate_population(pop_idx, pop_port, db_nut, inv_goals)
+    best_history = [float(pop_fit.max())]
+    avg_history = [float(pop_fit.mean())]
+    std_history = [float(pop_fit.std())]
+    top = top_k(pop_fit, pool_size)
+    pop_idx, pop_port, pop_fit = pop_idx[top], pop_port[top], pop_fit[top]
+
+    done = 0
+    while True:
+        for _ in range(min(migration_interval, generations - done)):
+            pop_idx, pop_port, pop_fit = next_generation(pop_idx, pop_port, pop_fit, n_elite, n_children, breed)
+            best_history.append(float(pop_fit.max()))
+            avg_history.append(float(pop_fit.mean()))
+            std_history.append(float(pop_fit.std()))
+            top = top_k(pop_fit, pool_size)
+            pop_idx, pop_port, pop_fit = pop_idx[top], pop_port[top], pop_fit[top]
+            done += 1
+
+        conn.send((pop_idx[:n_migrants], pop_port[:n_migrants], pop_fit[:n_migrants],
+                   best_history, avg_history, std_history))
+        best_history, avg_history, std_history = [], [], []
+        imm_idx, imm_port, imm_fit, stop = conn.recv()
+        if stop:
+            break
+
+        # immigrants replace the weakest members of the ranked pool
+        pop_idx[-n_migrants:], pop_port[-n_migrants:], pop_fit[-n_migrants:] = imm_idx, imm_port, imm_fit
+        top = top_k(pop_fit, pool_size)
+        pop_idx, pop_port, pop_fit = pop_idx[top], pop_port[top], pop_fit[top]
+
+    conn.send((pop_idx[0], pop_port[0], float(pop_fit[0])))
+
+def _island_model(db, inv_goals, allowed, allowed_counts, population_size, islands, generations, elitism,
+                  early_stop, mutation_rate, migration_interval, n_migrants, progress_cb):
+    """Run one _island_worker process per deme and route migrants between them in a ring."""
+    nut = db.all_nutrition
+    shm = _share_array(nut)
+    procs, conns = [], []
+    try:
+        for seed in rng.integers(0, 2**32, size=islands).tolist():
+            master_conn, worker_conn = _mp_context.Pipe()
+            proc = _mp_context.Process(target=_island_worker, daemon=True,
+                                       args=(seed, shm.name, nut.shape, allowed, allowed_counts, inv_goals,
+                                             population_size // islands, elitism, mutation_rate, generations,
+                                             migration_interval, n_migrants, worker_conn))
+            proc.start()
+            worker_conn.close()
+            procs.append(proc)
+            conns.append(master_conn)
+
+        best_history, avg_history = [], []
+        stagnation = 0
+        stop = False
+        while not stop:
+            reports = [conn.recv() for conn in conns]
+            for gen in range(len(reports[0][3])):
+                gen_best = [r[3][gen] for r in reports]
+                gen_avg = [r[4][gen] for r in reports]
+                gen_std = [r[5][gen] for r in reports]
+                best_history.append(max(gen_best))
+                avg_history.append(sum(gen_avg) / islands)
+                if len(best_history) < 2 or stop:
+                    continue
+                if abs(best_history[-1] - best_history[-2]) < 1e-3:
+                    stagnation += 1
+                else:
+                    stagnation = 0
+                # spread of the union of equally sized islands: within-island plus between-island variance
+                fit_std = np.sqrt(np.mean(np.square(gen_std)) + np.var(gen_avg))
+                stop = converged(best_history, fit_std, stagnation, early_stop)
+            stop = stop or len(best_history) > generations
+            if progress_cb is not None:
+                progress_cb(len(best_history) - 1, best_history, avg_history)
+            # ring topology: island i receives the emigrants of island i - 1
+            for i, conn in enumerate(conns):
+                conn.send(reports[i - 1][:3] + (stop,))
+
+        finals = [conn.recv() for conn in conns]
+        for proc in procs:
+            proc.join()
+    finally:
+        for conn in conns:
+            conn.close()
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+        shm.close()
+        shm.unlink()
+
+    best_idx, best_port, _ = max(finals, key=lambda f: f[2])
+    return best_idx, best_port, best_history, avg_history
 
 # ---------------------- Genetic Algorithm ---------------------- #
-def genetic_algorithm(db, nutrition_goals, allowed_allergens, population_size=100, generations=100, elitism=0.1, early_stop=10):
-    population = [Individual(db, allowed_allergens) for _ in range(population_size)]
-    for ind in population:
-        ind.evaluate(nutrition_goals)
-    population.sort(key=lambda x: -x.fitness)
-
-    best_fitness = population[0].fitness
-    best_history = [best_fitness]
-    avg_history = [sum(ind.fitness for ind in population) / population_size]
-    stagnation = 0
-
-    for gen in range(generations):
-        next_gen = population[:int(elitism * population_size)]
-        while len(next_gen) < population_size:
-            parents = random.sample(population[:50], 2)
-            child = parents[0].crossover(parents[1])
-            child.mutate(db, allowed_allergens)
-            child.evaluate(nutrition_goals)
-            next_gen.append(child)
-
-        population = sorted(next_gen, key=lambda x: -x.fitness)
-        best_fitness = population[0].fitness
-        best_history.append(best_fitness)
-        avg_history.append(sum(ind.fitness for ind in population) / population_size)
-
-        if abs(best_history[-1] - best_history[-2]) < 1e-3:
-            stagnation += 1
-            if stagnation >= early_stop:
-                break
-        else:
-            stagnation = 0
-
-    return population[0], best_history, avg_history
+def genetic_algorithm(db, nutrition_goals, allowed_allergens, population_size=100, generations=100, elitism=0.1, early_stop=10,
+                      mutation_rate=0.05, parallel='thread', workers=None, progress_cb=None, progress_every=5,
+                      islands=1, migration_interval=10, n_migrants=3):
+    """Evolve a weekly plan, returned as its (21, 5) food indices and portions plus the fitness histories.
+
+    parallel picks how breeding uses the cores:
+      'thread'  - in this process, letting Numba's prange and NumPy's BLAS use every core (default)
+      'process' - split across a pool of `workers` processes (default: one per core), each pinned to one thread
+      'none'    - in this process, on a single thread
+
+    islands > 1 instead splits the population into that many demes, each evolved in its own process,
+    which send their top n_migrants to the next island every migration_interval generations.
+    Each island runs on a single thread, so parallel and workers are then ignored.
+    progress_cb(gen, best_history, avg_history) is called every progress_every generations
+    (once per migration with islands).
+    """
+    if parallel not in ('thread', 'process', 'none'):
+        raise ValueError(f"parallel must be 'thread', 'process' or 'none', not {parallel!r}")
+    goals_vec = np.array([nutrition_goals[k] for k in NUTRIENTS], dtype=np.float32)
+    if not (np.isfinite(goals_vec) & (goals_vec > 0)).all():
+        raise ValueError(f"nutrition goals must be finite and positive, got {nutrition_goals}")
+    inv_goals = (1 / goals_vec).astype(np.float32)  # fitness multiplies by these instead of dividing
+    allowed, allowed_counts = db.allowed_table(allowed_allergens)
+
+    if islands > 1:
+        island_size = population_size // islands
+        if island_size < 2:
+            raise ValueError(f"each island needs at least 2 plans, got {population_size} plans for {islands} islands")
+        if not 0 < n_migrants < island_size:
+            raise ValueError(f"n_migrants must be between 1 and {island_size - 1}, got {n_migrants}")
+        if migration_interval < 1:
+            raise ValueError(f"migration_interval must be at least 1, got {migration_interval}")
+        return _island_model(db, inv_goals, allowed, allowed_counts, population_size, islands, generations, elitism,
+                             early_stop, mutation_rate, migration_interval, n_migrants, progress_cb)
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    threads = single_threaded() if parallel == 'none' else nullcontext()
+    executor = shm = None
+    pause_gc = gc.isenabled()
+    # the shared segment and the pool are created inside the try, so any failure from here on still frees them
+    try:
+        if parallel == 'process':
+            # workers map one shared copy of the nutrition table; the small settings are shipped once per worker
+            nut = db.all_nutrition
+            shm = _share_array(nut)
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context, initializer=_init_worker,
+                                           initargs=(shm.name, nut.shape, nut.dtype, inv_goals, allowed, allowed_counts,
+                                                     mutation_rate))
+
+        def breed(parent_idx, parent_port, parent_pairs):
+            if executor is not None:
+                chunks = [c for c in np.array_split(parent_pairs, workers) if len(c)]
+                results = list(executor.map(_breed_worker, [(parent_idx, parent_port, c) for c in chunks]))
+                return tuple(np.concatenate(parts) for parts in zip(*results))
+            return breed_children(parent_idx, parent_port, parent_pairs, db.all_nutrition, allowed, allowed_counts,
+                                  inv_goals, mutation_rate)
+
+        pop_idx, pop_port = random_population(allowed, allowed_counts, population_size)
+        pop_fit = evaluate_population(pop_idx, pop_port, db.all_nutrition, inv_goals)
+
+        n_elite = int(elitism * population_size)
+        n_children = population_size - n_elite
+        pool_size = min(50, population_size)
+        best_history = [float(pop_fit.max())]
+        avg_history = [float(pop_fit.mean())]
+        stagnation = 0
+
+        # only the mating pool (which contains the elites) survives a generation, so only it is ranked
+        top = top_k(pop_fit, pool_size)
+        pop_idx, pop_port, pop_fit = pop_idx[top], pop_port[top], pop_fit[top]
+
+        # spare the generation loop the cyclic collector's pauses; gc.disable() is process-wide, so the GUI thread
+        # (and any other) also goes without cycle collection until the run ends, which is harmless for a few seconds
+        if pause_gc:
+            gc.disable()
+        with threads:
+            for gen in range(generations):
+                pop_idx, pop_port, pop_fit = next_generation(pop_idx, pop_port, pop_fit, n_elite, n_children, breed)
+
+                best_history.append(float(pop_fit.max()))
+                avg_history.append(float(pop_fit.mean()))
+                fit_std = float(pop_fit.std())
+
+                top = top_k(pop_fit, pool_size)
+                pop_idx, pop_port, pop_fit = pop_idx[top], pop_port[top], pop_fit[top]
+                if progress_cb is not None and gen % progress_every == 0:
+                    progress_cb(gen, best_history, avg_history)
+
+                if abs(best_history[-1] - best_history[-2]) < 1e-3:
+                    stagnation += 1
+                else:
+                    stagnation = 0
+                if converged(best_history, fit_std, stagnation, early_stop):
+                    break
+    finally:
+        if pause_gc:
+            gc.enable()
+        if executor is not None:
+            executor.shutdown()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    return pop_idx[0], pop_port[0], best_history, avg_history
 
 # ---------------------- GUI ---------------------- #
 class DietPlannerGUI:
@@ -132,7 +534,9 @@ class DietPlannerGUI:
         ttk.Label(input_frame, text="Allowed Allergens").grid(row=0, column=len(self.goals))
         ttk.Entry(input_frame, textvariable=self.allergen_var, width=20).grid(row=1, column=len(self.goals))
 
-        ttk.Button(input_frame, text="Run Optimizer", command=self.run_thread).grid(row=1, column=len(self.goals)+1)
+        # one run at a time: the compiled breeding kernel must not be entered from two threads at once
+        self.run_button = ttk.Button(input_frame, text="Run Optimizer", command=self.run_thread)
+        self.run_button.grid(row=1, column=len(self.goals)+1)
 
         # Plan display
         self.plan_frame = ttk.LabelFrame(root, text="Weekly Meal Plan")
@@ -146,55 +550,116 @@ class DietPlannerGUI:
         plot_frame.pack(fill='both', expand=True, padx=10, pady=5)
 
         self.fig, self.ax = plt.subplots(figsize=(5, 2))
+        self.ax.set_title("Fitness over Generations")
+        self.ax.set_xlabel("Generation")
+        self.ax.set_ylabel("Fitness")
+        # animated lines are left out of full redraws and blitted over a cached background instead
+        self.best_line, = self.ax.plot([], [], label='Best', color='green', animated=True)
+        self.avg_line, = self.ax.plot([], [], label='Average', color='orange', animated=True)
+        self.ax.legend()
+        self.rescale = True
+        self.bg = None
+
         self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
 
-    def run_thread(self):
-        threading.Thread(target=self.run_optimizer, daemon=True).start()
+        # Tk is not thread-safe: the optimizer thread only posts messages, the main loop applies them
+        self.ui_queue = queue.Queue()
+        self.root.after(50, self._poll_ui)
 
-    def run_optimizer(self):
+    def run_thread(self):
         try:
-            for k in self.goals:
-                self.goals[k] = float(self.entries[k].get())
+            goals = {k: float(self.entries[k].get()) for k in self.goals}
+            if not all(0 < v < float('inf') for v in goals.values()):  # also rejects NaN
+                raise ValueError("goals must be positive")
+            self.goals = goals
             self.allowed_allergens = set(self.allergen_var.get().split(','))
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numeric goals.")
+            messagebox.showerror("Input Error", "Please enter positive numeric goals.")
             return
 
         self.text_display.delete(1.0, tk.END)
-        self.ax.clear()
+        self.best_line.set_data([], [])
+        self.avg_line.set_data([], [])
+        self.rescale = True
         self.canvas.draw()
 
-        sol, best_hist, avg_hist = genetic_algorithm(
-            self.db, self.goals, self.allowed_allergens,
-            population_size=100, generations=150, early_stop=15, elitism=0.1)
+        self.run_button.state(['disabled'])
+        threading.Thread(target=self.run_optimizer, daemon=True).start()
 
-        self.display_solution(sol)
-        self.plot_history(best_hist, avg_hist)
+    def run_optimizer(self):
+        def progress(gen, best_hist, avg_hist):
+            self.ui_queue.put(('gen', list(best_hist), list(avg_hist)))
+
+        try:
+            best_idx, best_port, best_hist, avg_hist = genetic_algorithm(
+                self.db, self.goals, self.allowed_allergens,
+                population_size=100, generations=150, early_stop=15, elitism=0.1, progress_cb=progress)
+        except Exception as e:
+            self.ui_queue.put(('error', str(e)))
+            return
 
-    def display_solution(self, solution):
+        self.ui_queue.put(('done', best_idx, best_port, best_hist, avg_hist))
+
+    def _poll_ui(self):
+        try:
+            while True:
+                msg = self.ui_queue.get_nowait()
+                if msg[0] == 'gen':
+                    self.plot_history(*msg[1:])
+                elif msg[0] == 'done':
+                    self.run_button.state(['!disabled'])
+                    self.display_solution(*msg[1:3])
+                    self.plot_history(*msg[3:])
+                elif msg[0] == 'error':
+                    self.run_button.state(['!disabled'])
+                    messagebox.showerror("Optimizer Error", msg[1])
+        except queue.Empty:
+            pass
+        finally:
+            # a message that fails to render must not stop the polling, or every later message is lost
+            self.root.after(50, self._poll_ui)
+
+    def display_solution(self, best_idx, best_port):
         output = []
         for day in range(7):
             output.append(f"\nDAY {day+1}")
             output.append("-" * 30)
             for m in range(3):
                 idx = day * 3 + m
-                meal = solution.genes[idx]
                 output.append(f"  Meal {m+1}:")
-                for cat in ['staple', 'side', 'vegetable', 'fruit', 'complement']:
-                    f = meal[cat]
-                    p = meal[f'portion_{cat}']
-                    output.append(f"    {cat.capitalize():<12}: {f['name']} x{p:.1f}")
+                for k, cat in enumerate(CATEGORIES):
+                    name = self.db.names[k][best_idx[idx, k] - self.db.cat_offsets[k]]
+                    p = best_port[idx, k]
+                    output.append(f"    {cat.capitalize():<12}: {name} x{p:.1f}")
         self.text_display.insert(tk.END, '\n'.join(output))
 
+    def _on_draw(self, event):
+        # every full redraw (including window resizes) refreshes the cached background
+        self.bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.best_line)
+        self.ax.draw_artist(self.avg_line)
+
     def plot_history(self, best_hist, avg_hist):
-        self.ax.plot(best_hist, label='Best', color='green')
-        self.ax.plot(avg_hist, label='Average', color='orange')
-        self.ax.set_title("Fitness over Generations")
-        self.ax.set_xlabel("Generation")
-        self.ax.set_ylabel("Fitness")
-        self.ax.legend()
-        self.canvas.draw()
+        gens = range(len(best_hist))
+        self.best_line.set_data(gens, best_hist)
+        self.avg_line.set_data(gens, avg_hist)
+
+        lo, hi = min(avg_hist + best_hist), max(avg_hist + best_hist)
+        ymin, ymax = self.ax.get_ylim()
+        if self.rescale or self.bg is None or len(best_hist) > self.ax.get_xlim()[1] or lo < ymin or hi > ymax:
+            # the lines outgrew the axes: rescale with headroom and redraw everything once
+            pad = 0.1 * (hi - lo) or 0.1
+            self.ax.set_xlim(0, max(10, 2 * len(best_hist)))
+            self.ax.set_ylim(lo - pad, hi + pad)
+            self.rescale = False
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.bg)
+            self.ax.draw_artist(self.best_line)
+            self.ax.draw_artist(self.avg_line)
+        self.canvas.blit(self.ax.bbox)
 
 if __name__ == '__main__':
     root = tk.Tk()